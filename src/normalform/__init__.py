@@ -1,7 +1,7 @@
 """OpenAI Capture - A minimal wrapper that captures API call payloads."""
 
-from .client import TrackedOpenAI, AsyncTrackedOpenAI
+from .client import TrackedOpenAI, AsyncTrackedOpenAI, HistoryView
 from .models import CapturedRequest
 
-__all__ = ["TrackedOpenAI", "AsyncTrackedOpenAI", "CapturedRequest"]
+__all__ = ["TrackedOpenAI", "AsyncTrackedOpenAI", "CapturedRequest", "HistoryView"]
 __version__ = "0.1.0"
@@ -2,22 +2,269 @@
 
 from __future__ import annotations
 
-import json
-from collections import deque
-from datetime import datetime
-from typing import Any, Mapping
+import sys
+import time
+from typing import Any, Callable, Iterator, List, Literal, Mapping, Sequence, Tuple, Union, overload
 
 import httpx
 from openai import OpenAI, AsyncOpenAI
 
 from .models import CapturedRequest
 
+# Set by the OpenAI SDK on every attempt; non-zero on automatic retries.
+_RETRY_COUNT_HEADER = "x-stainless-retry-count"
 
-class TrackedOpenAI(OpenAI):
+CaptureMode = Literal["eager", "lazy"]
+
+# Request details copied by the hook: method, url, base_url, timestamp, raw
+# headers (without Authorization) and raw body. Lazy mode stores these until
+# first read, then _build_captured turns them into a CapturedRequest.
+_PendingCapture = Tuple[str, str, str, float, List[Tuple[bytes, bytes]], bytes]
+_HistoryEntry = Union[CapturedRequest, _PendingCapture]
+
+
+def _install_hook(http_client: httpx.Client | httpx.AsyncClient, hook: Callable[..., Any]) -> None:
+    """Register ``hook`` as the first request hook of ``http_client``, in place."""
+    http_client.event_hooks.setdefault("request", []).insert(0, hook)
+
+
+def _snapshot_request(request: httpx.Request, timestamp: float, base_url_str: str) -> _PendingCapture:
+    """Copy what the history needs out of an outgoing request.
+
+    Nothing keeps a reference to ``request`` itself, so later hooks cannot
+    change a capture. The API key is dropped here so it is never held by
+    the history. ``base_url_str`` is the client's own cached string, so
+    every entry shares one object.
+    """
+    try:
+        raw_body = request.content
+    except httpx.RequestNotRead:
+        # Streamed bodies (e.g. multipart file uploads) are not buffered
+        raw_body = b""
+    return (
+        sys.intern(request.method),
+        str(request.url),
+        base_url_str,
+        timestamp,
+        [item for item in request.headers.raw if item[0].lower() != b"authorization"],
+        raw_body,
+    )
+
+
+def _build_captured(
+    method: str,
+    url: str,
+    base_url: str,
+    timestamp: float,
+    raw_headers: list[tuple[bytes, bytes]],
+    raw_body: bytes,
+) -> CapturedRequest:
+    """Build a CapturedRequest from a pending capture.
+
+    Headers are decoded and the body parsed only when the capture is inspected.
+    """
+    return CapturedRequest(
+        method=method,
+        url=url,
+        base_url=base_url,
+        timestamp=timestamp,
+        _raw_headers=raw_headers,
+        _raw_body=raw_body,
+    )
+
+
+def _record_request(
+    history: _HistoryBuffer, request: httpx.Request, base_url_str: str, eager: bool
+) -> None:
+    """Append ``request`` to ``history``; the body of both clients' hooks.
+
+    httpx fires request hooks on every attempt, so SDK retries of a call
+    that was already captured are skipped.
+    """
+    if request.headers.get(_RETRY_COUNT_HEADER, "0") != "0":
+        return
+
+    entry = _snapshot_request(request, time.time(), base_url_str)
+    history.append(_build_captured(*entry) if eager else entry)
+
+
+class _HistoryBuffer:
+    """Fixed-capacity ring buffer holding the most recent history entries.
+
+    Appending to a full buffer evicts the oldest entry. Indexing and
+    iteration are oldest first and build pending lazy-mode entries in place.
+    As with ``collections.deque``, an iterator raises ``RuntimeError`` if
+    the buffer is appended to or cleared while it is in use.
+
+    The backing list is rounded up to a power of two so that index
+    wrap-around is a bitwise AND rather than a modulo; at most ``size``
+    entries are ever visible.
+    """
+
+    __slots__ = ("_items", "_size", "_mask", "_idx", "_len", "_mutations")
+
+    def __init__(self, size: int) -> None:
+        if size < 0:
+            raise ValueError(f"history_size must be non-negative, got {size}")
+        capacity = 1 << max(size - 1, 0).bit_length()
+        self._items: list[_HistoryEntry | None] = [None] * capacity
+        self._size = size
+        self._mask = capacity - 1
+        self._idx = 0  # next slot to write
+        self._len = 0
+        self._mutations = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index: int) -> CapturedRequest:
+        n = self._len
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("history index out of range")
+        slot = (self._idx - n + index) & self._mask
+        entry = self._items[slot]
+        if type(entry) is tuple:
+            entry = self._items[slot] = _build_captured(*entry)
+        return entry
+
+    def __iter__(self) -> Iterator[CapturedRequest]:
+        mutations = self._mutations
+        for i in range(self._len):
+            yield self[i]
+            if self._mutations != mutations:
+                raise RuntimeError("history mutated during iteration")
+
+    def append(self, entry: _HistoryEntry) -> None:
+        size = self._size
+        if not size:
+            return
+        idx = self._idx
+        items = self._items
+        if self._len < size:
+            self._len += 1
+        else:
+            # Drop the evicted entry so spare slots don't keep it alive
+            items[(idx - size) & self._mask] = None
+        items[idx] = entry
+        self._idx = (idx + 1) & self._mask
+        self._mutations += 1
+
+    def clear(self) -> None:
+        self._items = [None] * (self._mask + 1)
+        self._idx = 0
+        self._len = 0
+        self._mutations += 1
+
+
+class HistoryView(Sequence[CapturedRequest]):
+    """Read-only, oldest-first view of a client's captured requests.
+
+    The view is live: it reflects requests captured (or history cleared)
+    after it was obtained. Use ``list(view)`` to take a snapshot; iterating
+    the view while requests are being captured raises ``RuntimeError``.
+    """
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self, buffer: _HistoryBuffer) -> None:
+        self._buffer = buffer
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @overload
+    def __getitem__(self, index: int) -> CapturedRequest: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[CapturedRequest]: ...
+
+    def __getitem__(self, index: int | slice) -> CapturedRequest | list[CapturedRequest]:
+        if isinstance(index, slice):
+            buffer = self._buffer
+            return [buffer[i] for i in range(*index.indices(len(buffer)))]
+        return self._buffer[index]
+
+    def __iter__(self) -> Iterator[CapturedRequest]:
+        return iter(self._buffer)
+
+    def __eq__(self, other: object) -> bool:
+        # Compare by value against other sequences, as the old list did
+        if isinstance(other, Sequence) and not isinstance(other, (str, bytes)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"HistoryView({list(self)!r})"
+
+
+class _CaptureMixin:
+    """History state and accessors shared by both tracked clients.
+
+    Subclasses provide the ``_capture_request`` hook (sync or async).
+    """
+
+    base_url: httpx.URL
+
+    def _setup_capture(
+        self,
+        http_client: httpx.Client | httpx.AsyncClient,
+        history_size: int,
+        capture_mode: CaptureMode,
+    ) -> None:
+        if capture_mode not in ("eager", "lazy"):
+            raise ValueError(f"capture_mode must be 'eager' or 'lazy', got {capture_mode!r}")
+
+        self._history = _HistoryBuffer(history_size)
+        self._eager = capture_mode == "eager"
+        self._base_url_obj: httpx.URL | None = None
+        self._base_url_str = ""
+
+        # Install our request hook ahead of any hooks the caller configured.
+        # history_size=0 disables capture, so no hook is installed at all.
+        if history_size:
+            _install_hook(http_client, self._capture_request)
+
+    def _current_base_url_str(self) -> str:
+        """The base URL without its trailing slash.
+
+        The string is cached, and re-derived only when ``base_url`` is
+        reassigned: the SDK's setter stores a new ``httpx.URL`` object.
+        """
+        base_url = self.base_url
+        if base_url is not self._base_url_obj:
+            self._base_url_obj = base_url
+            self._base_url_str = str(base_url).rstrip("/")
+        return self._base_url_str
+
+    @property
+    def history(self) -> HistoryView:
+        """Captured requests, oldest first, as a live read-only view."""
+        return HistoryView(self._history)
+
+    @property
+    def last_request(self) -> CapturedRequest | None:
+        """The most recent captured request, or None if no requests have been made."""
+        return self._history[-1] if self._history else None
+
+    def clear_history(self) -> None:
+        """Clear all captured requests from history."""
+        self._history.clear()
+
+
+class TrackedOpenAI(_CaptureMixin, OpenAI):
     """OpenAI client wrapper that captures the last N API call payloads.
 
     Args:
         history_size: Maximum number of requests to keep in history. Defaults to 3.
+            Pass 0 to disable capture without any per-request overhead.
+        capture_mode: ``"lazy"`` (the default) copies each outgoing request's
+            details in the hook and builds its CapturedRequest the first time
+            it is read from ``history`` or ``last_request``. ``"eager"`` builds
+            it inside the request hook.
         **kwargs: All standard OpenAI client arguments.
 
     Example:
@@ -30,75 +277,35 @@ class TrackedOpenAI(OpenAI):
         'gpt-4'
     """
 
-    def __init__(self, *, history_size: int = 3, **kwargs: Any) -> None:
-        self._history: deque[CapturedRequest] = deque(maxlen=history_size)
-        self._history_size = history_size
-
-        # Create a custom HTTP client with request hooks
+    def __init__(
+        self,
+        *,
+        history_size: int = 3,
+        capture_mode: CaptureMode = "lazy",
+        **kwargs: Any,
+    ) -> None:
         http_client = kwargs.pop("http_client", None)
         if http_client is None:
-            http_client = httpx.Client(
-                event_hooks={"request": [self._capture_request]}
-            )
-        else:
-            # Add our hook to existing client's hooks
-            existing_hooks = http_client.event_hooks.get("request", [])
-            http_client.event_hooks["request"] = [self._capture_request] + list(existing_hooks)
+            http_client = httpx.Client()
+        self._setup_capture(http_client, history_size, capture_mode)
 
         super().__init__(http_client=http_client, **kwargs)
 
-    @property
-    def history(self) -> list[CapturedRequest]:
-        """List of captured requests, oldest first."""
-        return list(self._history)
-
-    @property
-    def last_request(self) -> CapturedRequest | None:
-        """The most recent captured request, or None if no requests have been made."""
-        return self._history[-1] if self._history else None
-
-    def clear_history(self) -> None:
-        """Clear all captured requests from history."""
-        self._history.clear()
-
     def _capture_request(self, request: httpx.Request) -> None:
         """Event hook to capture request details before sending."""
-        # Parse the request body
-        body: dict[str, Any] = {}
-        if request.content:
-            try:
-                body = json.loads(request.content.decode("utf-8"))
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                pass
-
-        # Extract the endpoint from the URL path
-        url_str = str(request.url)
-        base_url = str(self.base_url).rstrip("/")
-        endpoint = url_str.replace(base_url, "").lstrip("/")
-
-        # Build captured request with common fields extracted
-        captured = CapturedRequest(
-            timestamp=datetime.utcnow(),
-            method=request.method,
-            url=url_str,
-            base_url=base_url,
-            endpoint=endpoint,
-            model=body.get("model"),
-            temperature=body.get("temperature"),
-            max_tokens=body.get("max_tokens") or body.get("max_completion_tokens"),
-            messages=body.get("messages"),
-            body=body,
-            headers={k: v for k, v in request.headers.items() if k.lower() != "authorization"},
-        )
-
-        self._history.append(captured)
-
-
-class AsyncTrackedOpenAI(AsyncOpenAI):
+        _record_request(self._history, request, self._current_base_url_str(), self._eager)
+
+
+class AsyncTrackedOpenAI(_CaptureMixin, AsyncOpenAI):
     """Async OpenAI client wrapper that captures the last N API call payloads.
 
     Args:
         history_size: Maximum number of requests to keep in history. Defaults to 3.
+            Pass 0 to disable capture without any per-request overhead.
+        capture_mode: ``"lazy"`` (the default) copies each outgoing request's
+            details in the hook and builds its CapturedRequest the first time
+            it is read from ``history`` or ``last_request``. ``"eager"`` builds
+            it inside the request hook.
         **kwargs: All standard AsyncOpenAI client arguments.
 
     Example:
@@ -111,65 +318,24 @@ class AsyncTrackedOpenAI(AsyncOpenAI):
         'gpt-4'
     """
 
-    def __init__(self, *, history_size: int = 3, **kwargs: Any) -> None:
-        self._history: deque[CapturedRequest] = deque(maxlen=history_size)
-        self._history_size = history_size
-
-        # Create a custom HTTP client with request hooks
+    def __init__(
+        self,
+        *,
+        history_size: int = 3,
+        capture_mode: CaptureMode = "lazy",
+        **kwargs: Any,
+    ) -> None:
         http_client = kwargs.pop("http_client", None)
         if http_client is None:
-            http_client = httpx.AsyncClient(
-                event_hooks={"request": [self._capture_request]}
-            )
-        else:
-            # Add our hook to existing client's hooks
-            existing_hooks = http_client.event_hooks.get("request", [])
-            http_client.event_hooks["request"] = [self._capture_request] + list(existing_hooks)
+            http_client = httpx.AsyncClient()
+        self._setup_capture(http_client, history_size, capture_mode)
 
         super().__init__(http_client=http_client, **kwargs)
 
-    @property
-    def history(self) -> list[CapturedRequest]:
-        """List of captured requests, oldest first."""
-        return list(self._history)
-
-    @property
-    def last_request(self) -> CapturedRequest | None:
-        """The most recent captured request, or None if no requests have been made."""
-        return self._history[-1] if self._history else None
-
-    def clear_history(self) -> None:
-        """Clear all captured requests from history."""
-        self._history.clear()
-
     async def _capture_request(self, request: httpx.Request) -> None:
-        """Event hook to capture request details before sending."""
-        # Parse the request body
-        body: dict[str, Any] = {}
-        if request.content:
-            try:
-                body = json.loads(request.content.decode("utf-8"))
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                pass
-
-        # Extract the endpoint from the URL path
-        url_str = str(request.url)
-        base_url = str(self.base_url).rstrip("/")
-        endpoint = url_str.replace(base_url, "").lstrip("/")
-
-        # Build captured request with common fields extracted
-        captured = CapturedRequest(
-            timestamp=datetime.utcnow(),
-            method=request.method,
-            url=url_str,
-            base_url=base_url,
-            endpoint=endpoint,
-            model=body.get("model"),
-            temperature=body.get("temperature"),
-            max_tokens=body.get("max_tokens") or body.get("max_completion_tokens"),
-            messages=body.get("messages"),
-            body=body,
-            headers={k: v for k, v in request.headers.items() if k.lower() != "authorization"},
-        )
-
-        self._history.append(captured)
+        """Event hook to capture request details before sending.
+
+        AsyncClient awaits its request hooks, so this has to be a coroutine,
+        but it never suspends: all the work is the synchronous recording.
+        """
+        _record_request(self._history, request, self._current_base_url_str(), self._eager)
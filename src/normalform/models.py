@@ -1,26 +1,216 @@
-"""Pydantic models for captured API call payloads."""
+"""Data models for captured API call payloads."""
 
 from __future__ import annotations
 
-from datetime import datetime
+import copy
+import sys
+import time
+from datetime import datetime, timezone
 from typing import Any
 
-from pydantic import BaseModel, ConfigDict, Field
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    import json as orjson  # type: ignore[no-redef]
 
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - msgspec is an optional speedup
+    msgspec = None
 
-class CapturedRequest(BaseModel):
-    """A captured OpenAI API request payload."""
 
-    model_config = ConfigDict(extra="allow")
+def _decode_header(raw: bytes) -> str:
+    """Decode a raw header name or value the way httpx does."""
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+class _CapturedRequestBase:
+    """Derived fields shared by both CapturedRequest implementations.
+
+    The raw request body is kept as bytes and only parsed the first time
+    ``body`` or one of the fields derived from it is accessed. ``endpoint``
+    is likewise derived from ``url`` and ``base_url`` on first access, and
+    ``headers`` is decoded from the raw header pairs on first access.
+    """
+
+    __slots__ = ()
+
+    # Defined here so both implementations compare and print the captured
+    # data and its derived fields, never the raw bytes or the cache slots.
+    def __repr__(self) -> str:
+        return (
+            f"CapturedRequest(method={self.method!r}, url={self.url!r}, "
+            f"base_url={self.base_url!r}, endpoint={self.endpoint!r}, "
+            f"model={self.model!r}, max_tokens={self.max_tokens!r}, "
+            f"timestamp={self.timestamp!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return (
+            self.method == other.method
+            and self.url == other.url
+            and self.base_url == other.base_url
+            and self.timestamp == other.timestamp
+            and self._raw_headers == other._raw_headers
+            and self._raw_body == other._raw_body
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Request headers with lowercased names (Authorization is never kept)."""
+        headers = self._headers
+        if headers is None:
+            headers = {}
+            for raw_key, raw_value in self._raw_headers:
+                key = _decode_header(raw_key).lower()
+                value = _decode_header(raw_value)
+                # Repeated headers are comma-joined, as httpx.Headers does
+                headers[key] = f"{headers[key]}, {value}" if key in headers else value
+            self._headers = headers
+        return headers
+
+    @property
+    def endpoint(self) -> str:
+        """API endpoint path, relative to ``base_url``."""
+        endpoint = self._endpoint
+        if endpoint is None:
+            url, base_url = self.url, self.base_url
+            # base_url carries no trailing slash, so at most one is left over
+            endpoint = url[len(base_url):] if url.startswith(base_url) else url
+            if endpoint[:1] == "/":
+                endpoint = endpoint[1:]
+            # Not interned: paths such as files/<id> are unbounded in number
+            self._endpoint = endpoint
+        return endpoint
+
+    @property
+    def body(self) -> dict[str, Any]:
+        """Full request body as a dict.
+
+        Only POST bodies are parsed; other methods, and bodies that are not
+        a JSON object, yield an empty dict.
+        """
+        body = self._body
+        if body is None:
+            body = {}
+            if self._raw_body and self.method == "POST":
+                try:
+                    parsed = orjson.loads(self._raw_body)
+                except ValueError:
+                    # orjson.JSONDecodeError, json.JSONDecodeError and
+                    # UnicodeDecodeError are all ValueError subclasses.
+                    pass
+                else:
+                    if type(parsed) is dict:
+                        body = parsed
+                        # Share one string per model name across history entries
+                        model = body.get("model")
+                        if type(model) is str:
+                            body["model"] = sys.intern(model)
+            self._body = body
+        return body
+
+    @property
+    def datetime(self) -> datetime:
+        """When the request was made, as a timezone-aware UTC datetime."""
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
+
+    @property
+    def model(self) -> str | None:
+        """Model name, if present in the body."""
+        return self.body.get("model")
+
+    @property
+    def temperature(self) -> float | None:
+        """Temperature setting, if present in the body."""
+        return self.body.get("temperature")
+
+    @property
+    def max_tokens(self) -> int | None:
+        """Max tokens setting (``max_tokens`` or ``max_completion_tokens``)."""
+        body = self.body
+        return body.get("max_tokens") or body.get("max_completion_tokens")
+
+    @property
+    def messages(self) -> list[dict[str, Any]] | None:
+        """Chat messages, if present in the body."""
+        return self.body.get("messages")
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the captured request as a plain dict (deep-copied)."""
+        return copy.deepcopy({
+            "timestamp": self.timestamp,
+            "datetime": self.datetime,
+            "method": self.method,
+            "url": self.url,
+            "base_url": self.base_url,
+            "endpoint": self.endpoint,
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "messages": self.messages,
+            "body": self.body,
+            "headers": self.headers,
+        })
+
+
+if msgspec is not None:
+
+    class CapturedRequest(_CapturedRequestBase, msgspec.Struct, kw_only=True, omit_defaults=True):
+        """A captured OpenAI API request payload."""
+
+        method: str
+        url: str
+        base_url: str
+        timestamp: float = msgspec.field(default_factory=time.time)
+        _raw_headers: list[tuple[bytes, bytes]] = msgspec.field(default_factory=list)
+        _raw_body: bytes = b""
+        _body: dict[str, Any] | None = None
+        _endpoint: str | None = None
+        _headers: dict[str, str] | None = None
+
+else:
+
+    class CapturedRequest(_CapturedRequestBase):  # type: ignore[no-redef]
+        """A captured OpenAI API request payload."""
+
+        # Declared by hand rather than via a dataclass so that every Python
+        # version gets a fixed, __dict__-free layout.
+        __slots__ = (
+            "method",
+            "url",
+            "base_url",
+            "timestamp",
+            "_raw_headers",
+            "_raw_body",
+            "_body",
+            "_endpoint",
+            "_headers",
+        )
+
+        def __init__(
+            self,
+            method: str,
+            url: str,
+            base_url: str,
+            timestamp: float | None = None,
+            _raw_headers: list[tuple[bytes, bytes]] | None = None,
+            _raw_body: bytes = b"",
+        ) -> None:
+            self.method = method
+            self.url = url
+            self.base_url = base_url
+            self.timestamp = time.time() if timestamp is None else timestamp
+            self._raw_headers = [] if _raw_headers is None else _raw_headers
+            self._raw_body = _raw_body
+            self._body = None
+            self._endpoint = None
+            self._headers = None
 
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
-    method: str
-    url: str
-    base_url: str
-    endpoint: str
-    model: str | None = None
-    temperature: float | None = None
-    max_tokens: int | None = None
-    messages: list[dict[str, Any]] | None = None
-    body: dict[str, Any] = Field(default_factory=dict)
-    headers: dict[str, str] = Field(default_factory=dict)
@@ -1,12 +1,16 @@
 """Minimal test to verify request capture functionality."""
 
+import importlib.util
 import json
+import sys
+from datetime import datetime, timezone
 from unittest.mock import patch, MagicMock
 
 import httpx
 import pytest
 
-from normalform import TrackedOpenAI, CapturedRequest
+import normalform.models
+from normalform import AsyncTrackedOpenAI, TrackedOpenAI, CapturedRequest, HistoryView
 
 TEST_MODEL="gpt-4o-mini"
 
@@ -103,8 +107,63 @@ def test_history_limit():
         )
 
     assert len(client.history) == 2
-    
-    
+    assert [r.messages[0]["content"] for r in client.history] == ["Message 1", "Message 2"]
+    assert client.last_request is client.history[-1]
+
+
+@pytest.mark.parametrize("capture_mode", ["eager", "lazy"])
+def test_history_eviction_with_spare_slots(capture_mode):
+    """Test eviction when history_size is below the buffer's capacity."""
+    mock_transport = httpx.MockTransport(
+        lambda r: httpx.Response(
+            200, json={"id": "m", "object": "model", "created": 0, "owned_by": "o"}
+        )
+    )
+    client = TrackedOpenAI(
+        api_key="test-key",
+        http_client=httpx.Client(transport=mock_transport),
+        history_size=3,
+        capture_mode=capture_mode,
+    )
+
+    # Capacity is rounded up to 4, so eviction wraps past the spare slot
+    for i in range(7):
+        client.models.retrieve(f"model-{i}")
+        if i == 1:
+            assert [r.endpoint for r in client.history] == ["models/model-0", "models/model-1"]
+
+    assert len(client.history) == 3
+    assert [r.endpoint for r in client.history] == [
+        "models/model-4",
+        "models/model-5",
+        "models/model-6",
+    ]
+    assert client.history[0].endpoint == client.history[-3].endpoint == "models/model-4"
+    assert client.last_request.endpoint == "models/model-6"
+
+
+def test_zero_history_size_disables_capture():
+    """Test that history_size=0 installs no hook and captures nothing."""
+    mock_transport = httpx.MockTransport(
+        lambda r: httpx.Response(200, json={"object": "list", "data": []})
+    )
+    http_client = httpx.Client(transport=mock_transport)
+    client = TrackedOpenAI(api_key="test-key", http_client=http_client, history_size=0)
+
+    client.models.list()
+
+    assert http_client.event_hooks["request"] == []
+    assert len(client.history) == 0
+    assert client.last_request is None
+
+
+def test_negative_history_size():
+    """Test that a negative history size is rejected."""
+    with pytest.raises(ValueError):
+        TrackedOpenAI(api_key="test-key", history_size=-1)
+
+
+
 def test_clear_history():
     """Test that clear_history removes all captured requests."""
     mock_response = httpx.Response(
@@ -142,3 +201,288 @@ def test_clear_history():
     client.clear_history()
     assert len(client.history) == 0
     assert client.last_request is None
+
+
+def test_body_fields_parsed_from_raw_body():
+    """Test that body-derived fields are read from the raw request bytes."""
+    captured = CapturedRequest(
+        method="POST",
+        url="https://api.openai.com/v1/chat/completions",
+        base_url="https://api.openai.com/v1",
+        _raw_body=json.dumps({"model": TEST_MODEL, "max_completion_tokens": 64}).encode(),
+    )
+
+    assert captured.model == TEST_MODEL
+    assert captured.max_tokens == 64
+    assert captured.temperature is None
+    assert captured.to_dict()["body"] == {"model": TEST_MODEL, "max_completion_tokens": 64}
+
+    invalid = CapturedRequest(
+        method="POST",
+        url="https://api.openai.com/v1/chat/completions",
+        base_url="https://api.openai.com/v1",
+        _raw_body=b"not json",
+    )
+    assert invalid.body == {}
+    assert invalid.model is None
+
+    for raw_body in (b"[1, 2]", b'"text"', b"null"):
+        non_object = CapturedRequest(
+            method="POST",
+            url="https://api.openai.com/v1/chat/completions",
+            base_url="https://api.openai.com/v1",
+            _raw_body=raw_body,
+        )
+        assert non_object.body == {}
+        assert non_object.model is None
+        assert non_object.max_tokens is None
+
+    other_endpoint = CapturedRequest(
+        method="POST",
+        url="https://api.openai.com/v1/images/generations",
+        base_url="https://api.openai.com/v1",
+        _raw_body=b'{"model": "dall-e-3", "prompt": "a cat"}',
+    )
+    assert other_endpoint.model == "dall-e-3"
+
+    not_post = CapturedRequest(
+        method="DELETE",
+        url="https://api.openai.com/v1/files/file-123",
+        base_url="https://api.openai.com/v1",
+        _raw_body=b'{"model": "ignored"}',
+    )
+    assert not_post.body == {}
+
+
+@pytest.mark.parametrize("capture_mode", ["eager", "lazy"])
+def test_authorization_header_not_captured(capture_mode):
+    """Test that the API key is stripped from captured headers."""
+    mock_transport = httpx.MockTransport(
+        lambda r: httpx.Response(200, json={"object": "list", "data": []})
+    )
+    client = TrackedOpenAI(
+        api_key="test-key",
+        http_client=httpx.Client(transport=mock_transport),
+        capture_mode=capture_mode,
+    )
+
+    client.models.list()
+
+    captured = client.last_request
+    headers = captured.headers
+    assert "authorization" not in {k.lower() for k in headers}
+    assert headers["accept"] == "application/json"
+    assert "test-key" not in repr(captured)
+    assert "test-key" not in str(captured.to_dict())
+
+
+def test_derived_fields():
+    """Test the datetime, endpoint and headers derived from captured data."""
+    captured = CapturedRequest(
+        method="GET",
+        url="https://files.example.com/v1/uploads/abc",
+        base_url="https://api.openai.com/v1",
+        timestamp=0.0,
+        _raw_headers=[(b"Accept", b"application/json"), (b"X-Tag", b"a"), (b"x-tag", b"b")],
+    )
+
+    assert captured.datetime == datetime(1970, 1, 1, tzinfo=timezone.utc)
+    assert captured.to_dict()["datetime"] == captured.datetime
+    # URLs outside base_url are reported whole
+    assert captured.endpoint == "https://files.example.com/v1/uploads/abc"
+    # Repeated headers are comma-joined under their lowercased name
+    assert captured.headers == {"accept": "application/json", "x-tag": "a, b"}
+
+
+@pytest.mark.parametrize("capture_mode", ["eager", "lazy"])
+def test_multipart_upload_captured(capture_mode):
+    """Test that streamed multipart uploads are captured without their body."""
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        return httpx.Response(
+            200,
+            json={
+                "id": "file-123",
+                "object": "file",
+                "bytes": 5,
+                "created_at": 1677652288,
+                "filename": "data.jsonl",
+                "purpose": "batch",
+            },
+        )
+
+    client = TrackedOpenAI(
+        api_key="test-key",
+        http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        capture_mode=capture_mode,
+    )
+
+    client.files.create(file=("data.jsonl", b"{}\n"), purpose="batch")
+
+    assert len(attempts) == 1
+    captured = client.last_request
+    assert captured.endpoint == "files"
+    assert captured.method == "POST"
+    assert captured.body == {}
+
+
+def test_retries_not_captured():
+    """Test that SDK retries of a request are captured only once."""
+    responses = [
+        httpx.Response(500, headers={"retry-after-ms": "1"}, json={"error": {"message": "boom"}}),
+        httpx.Response(200, json={"object": "list", "data": []}),
+    ]
+    mock_transport = httpx.MockTransport(lambda r: responses.pop(0))
+    client = TrackedOpenAI(
+        api_key="test-key",
+        http_client=httpx.Client(transport=mock_transport),
+        max_retries=1,
+    )
+
+    client.models.list()
+
+    assert not responses
+    assert len(client.history) == 1
+
+
+@pytest.mark.parametrize("capture_mode", ["eager", "lazy"])
+def test_capture_modes(capture_mode):
+    """Test that eager and lazy capture expose the same request details."""
+    mock_transport = httpx.MockTransport(
+        lambda r: httpx.Response(200, json={"object": "list", "data": []})
+    )
+    client = TrackedOpenAI(
+        api_key="test-key",
+        http_client=httpx.Client(transport=mock_transport),
+        capture_mode=capture_mode,
+    )
+
+    client.models.list()
+
+    captured = client.last_request
+    assert isinstance(captured, CapturedRequest)
+    assert captured.method == "GET"
+    assert captured.endpoint == "models"
+    assert captured.body == {}
+    assert client.history[0] is captured
+
+
+def test_base_url_reassignment_captured():
+    """Test that captures follow a base_url changed after construction."""
+    mock_transport = httpx.MockTransport(
+        lambda r: httpx.Response(200, json={"object": "list", "data": []})
+    )
+    client = TrackedOpenAI(
+        api_key="test-key",
+        http_client=httpx.Client(transport=mock_transport),
+    )
+
+    client.models.list()
+    client.base_url = "https://proxy.example.com/openai/v1"
+    client.models.list()
+
+    first, second = client.history
+    assert first.base_url == "https://api.openai.com/v1"
+    assert second.base_url == "https://proxy.example.com/openai/v1"
+    assert first.endpoint == second.endpoint == "models"
+
+
+def test_invalid_capture_mode():
+    """Test that an unknown capture mode is rejected."""
+    with pytest.raises(ValueError):
+        TrackedOpenAI(api_key="test-key", capture_mode="sometimes")
+
+
+def test_history_is_live_view():
+    """Test that history is a read-only view that tracks new captures."""
+    mock_transport = httpx.MockTransport(
+        lambda r: httpx.Response(200, json={"object": "list", "data": []})
+    )
+    client = TrackedOpenAI(
+        api_key="test-key",
+        http_client=httpx.Client(transport=mock_transport),
+    )
+
+    history = client.history
+    assert isinstance(history, HistoryView)
+    assert len(history) == 0
+
+    client.models.list()
+    client.models.list()
+
+    assert len(history) == 2
+    assert history[-1] is client.last_request
+    assert history[:1] == [history[0]]
+    assert list(history) == [history[0], history[1]]
+    assert history == [history[0], history[1]]
+    assert history == client.history
+    assert history != [history[0]]
+    assert repr(history) == f"HistoryView({list(history)!r})"
+
+    with pytest.raises(RuntimeError, match="mutated during iteration"):
+        for _ in history:
+            client.models.list()
+
+    with pytest.raises(RuntimeError, match="mutated during iteration"):
+        for _ in history:
+            client.clear_history()
+    assert len(history) == 0
+
+
+async def test_async_prompt_captured():
+    """Test that the async client captures requests like the sync client."""
+    mock_transport = httpx.MockTransport(
+        lambda r: httpx.Response(200, json={"object": "list", "data": []})
+    )
+    client = AsyncTrackedOpenAI(
+        api_key="test-key",
+        http_client=httpx.AsyncClient(transport=mock_transport),
+    )
+
+    await client.models.list()
+
+    captured = client.last_request
+    assert isinstance(captured, CapturedRequest)
+    assert captured.method == "GET"
+    assert captured.endpoint == "models"
+
+
+def _fallback_captured_request():
+    """Load the CapturedRequest variant used when msgspec is not installed."""
+    spec = importlib.util.spec_from_file_location(
+        "_normalform_models_fallback", normalform.models.__file__
+    )
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, {"msgspec": None}):
+        spec.loader.exec_module(module)
+    return module.CapturedRequest
+
+
+@pytest.mark.parametrize(
+    "captured_cls", [CapturedRequest, _fallback_captured_request()], ids=["default", "fallback"]
+)
+def test_equality_and_repr_ignore_caches(captured_cls):
+    """Test that reading lazy fields changes neither equality nor repr."""
+    kwargs = dict(
+        method="POST",
+        url="https://api.openai.com/v1/chat/completions",
+        base_url="https://api.openai.com/v1",
+        timestamp=1.0,
+        _raw_headers=[(b"accept", b"application/json")],
+        _raw_body=b'{"model": "gpt-4o-mini"}',
+    )
+    first, second = captured_cls(**kwargs), captured_cls(**kwargs)
+    assert first == second
+
+    assert first.model == "gpt-4o-mini"
+    assert first.headers and first.endpoint
+    assert first == second
+    assert repr(first) == repr(second) == (
+        "CapturedRequest(method='POST', "
+        "url='https://api.openai.com/v1/chat/completions', "
+        "base_url='https://api.openai.com/v1', endpoint='chat/completions', "
+        "model='gpt-4o-mini', max_tokens=None, timestamp=1.0)"
+    )
+    assert first != captured_cls(**{**kwargs, "_raw_body": b"{}"})